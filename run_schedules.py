@@ -15,9 +15,9 @@ Docs:
     PyPI: https://pypi.org/project/cvpysdk/
 """
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from cvpysdk.commcell import Commcell
-from cvpysdk.policies.schedule_policies import SchedulePolicies
 
 # -------------------------------
 # CONFIGURATION — EDIT THESE
@@ -48,32 +48,56 @@ QUERY_RECENT_JOBS = True
 # Time window (minutes) to look back for jobs you just started
 RECENT_WINDOW_MINUTES = 3
 
+# Max number of jobs the Job Controller returns for the recent-jobs query
+JOB_QUERY_LIMIT = 500
+
+# Max number of policies triggered concurrently by run_by_names. The threads share one
+# cvpysdk connection (auth headers are refreshed on it in place), so keep this small.
+MAX_WORKERS = 4
+
+
+def _run_now(policy):
+    """Worker body: resolve and call run_now() so any failure surfaces via the future."""
+    # Triggers the policy immediately (equivalent to 'Run now' in UI)
+    return policy.run_now()
+
 
 def run_by_names(commcell: Commcell, names: list[str]) -> None:
     """Run schedule policies by NAME and print job IDs."""
-    sp = SchedulePolicies(commcell)
+    # SDK caches the policy listing on the Commcell connection
+    sp = commcell.schedule_policies
 
-    # Build map: name -> object
-    all_policies = sp.all_schedule_policies()  # dict of {name: id}
-    print(f"[INFO] Found {len(all_policies)} schedule policies on CommCell.")
+    # Build map: lower-cased name -> id (one listing, then dict lookups per name)
+    all_policies = sp.all_schedule_policies  # property: dict of {name: id}
+    name_to_id = {name.lower(): policy_id for name, policy_id in all_policies.items()}
+    print(f"[INFO] Found {len(name_to_id)} schedule policies on CommCell.")
 
+    resolved = []
     for name in names:
-        if not sp.has_policy(name):
+        if name.lower() not in name_to_id:
             print(f"[WARN] Schedule policy not found: '{name}'")
             continue
 
-        policy = sp.get(name)
-        try:
-            # Triggers the policy immediately (equivalent to 'Run now' in UI)
-            job_ids = policy.run_now()
-            print(f"[OK] '{name}' started. Job IDs from SDK: {job_ids}")
-        except Exception as e:
-            print(f"[ERROR] Run now failed for '{name}': {e}")
+        resolved.append((name, sp.get(name)))
+
+    if not resolved:
+        return
+
+    # run_now() is a blocking HTTPS call per policy; trigger them concurrently
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(resolved))) as ex:
+        futures = {ex.submit(_run_now, policy): name for name, policy in resolved}
+        for fut in as_completed(futures):
+            name = futures[fut]
+            try:
+                job_ids = fut.result()
+                print(f"[OK] '{name}' started. Job IDs from SDK: {job_ids}")
+            except Exception as e:
+                print(f"[ERROR] Run now failed for '{name}': {e}")
 
 
 def run_by_task_ids(commcell: Commcell, ids: list[int]) -> None:
     """Run schedule policies by taskId and print job IDs."""
-    sp = SchedulePolicies(commcell)
+    sp = commcell.schedule_policies
 
     for task_id in ids:
         try:
@@ -98,32 +122,41 @@ def list_recent_jobs(commcell: Commcell) -> None:
     jc = commcell.job_controller
 
     # Filter the job list to a short time window and the current user
-    cutoff = datetime.now(timezone.utc) - timedelta(minutes=RECENT_WINDOW_MINUTES)
-    all_jobs = jc.all_jobs()  # returns a dict keyed by jobId with details
+    now = datetime.now(timezone.utc)
+    cutoff_ts = (now - timedelta(minutes=RECENT_WINDOW_MINUTES)).timestamp()
+    # Upper bound (with clock-skew slack) rejects millisecond epochs, inf and nan, which
+    # would otherwise pass the cutoff and fail later in datetime.fromtimestamp()
+    max_ts = (now + timedelta(minutes=RECENT_WINDOW_MINUTES)).timestamp()
+    user_lc = USER.lower()
+    # Let the Job Controller apply the time window (lookup_time is in hours) and page size
+    # instead of pulling the full job history and filtering it here
+    all_jobs = jc.all_jobs(
+        lookup_time=RECENT_WINDOW_MINUTES / 60.0,
+        limit=JOB_QUERY_LIMIT
+    )  # dict keyed by jobId with details
 
     # Example fields in entries vary by version; we defensively parse submitTime/userName if present.
     recent = []
-    for jid, details in (all_jobs or {}).items():
-        try:
-            # submitTime may be epoch seconds or ISO string depending on build; handle common case
-            submit_time = details.get("submitTime") or details.get("startTime")
-            # Normalize times where possible (if present)
-            if isinstance(submit_time, (int, float)):
-                submitted = datetime.fromtimestamp(submit_time, tz=timezone.utc)
-            else:
-                submitted = None
-            user = (details.get("userName") or details.get("user") or "").lower()
-
-            if submitted and submitted >= cutoff and USER.lower() in user:
-                recent.append((jid, submitted, details.get("status")))
-        except Exception:
-            # Skip any malformed entries
+    # Malformed entries (non-dict rows, non-numeric or out-of-range times, non-string users)
+    # are skipped by explicit checks rather than try/except per row
+    for jid, d in (all_jobs or {}).items():
+        if not isinstance(d, dict):
+            continue
+        # submitTime may be epoch seconds or ISO string depending on build; handle common case
+        ts = d.get("submitTime") or d.get("startTime")
+        # Compare raw epoch values; only survivors get a datetime
+        if isinstance(ts, bool) or not isinstance(ts, (int, float)) or not cutoff_ts <= ts <= max_ts:
+            continue
+        user = d.get("userName") or d.get("user") or ""
+        if not isinstance(user, str) or user_lc not in user.lower():
             continue
+        recent.append((jid, ts, d.get("status")))
 
     if recent:
         recent.sort(key=lambda x: x[1])  # sort by submitted time
         print(f"[INFO] Jobs submitted by '{USER}' in last {RECENT_WINDOW_MINUTES} min:")
-        for jid, t, status in recent:
+        for jid, ts, status in recent:
+            t = datetime.fromtimestamp(ts, tz=timezone.utc)
             print(f"   - JobId={jid} at {t.isoformat()} status={status}")
     else:
         print(f"[INFO] No recent jobs found for '{USER}' in the last {RECENT_WINDOW_MINUTES} minutes.")
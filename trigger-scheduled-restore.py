@@ -13,12 +13,21 @@ Refs:
 """
 
 import base64
+import functools
 import json
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # optional: faster (de)serialization of large schedule/restore payloads
+except ImportError:
+    orjson = None
 
 # -------------------------------
 # CONFIG — EDIT THESE
@@ -52,25 +61,93 @@ OVERRIDES = {
 # Set to False only for quick testing with self-signed certs; prefer True in production
 VERIFY_TLS = True
 
+# Max number of schedules processed concurrently (each does one GET + one POST)
+MAX_WORKERS = 8
+
+# Retries for transient CommServe errors; exponential backoff of
+# RETRY_BACKOFF * 2**(n-1), first retry immediate on urllib3 2.x (0s, 1s, 2s, 4s, 8s)
+MAX_RETRIES = 5
+RETRY_BACKOFF = 0.5
+
 # -------------------------------
 # HELPERS
 # -------------------------------
 
+# operationType/subTaskType values that identify a restore subtask
+RESTORE_MARKERS = frozenset(("RESTORE",))
+
+# Association fields kept for CreateTask (Restore); add more if your workload expects them
+ASSOCIATION_KEYS = ("clientName", "appName", "instanceId", "backupsetId", "subclientId")
+
+# Password is sent base64-UTF8 encoded; encode once instead of on every login()
+_PASS_B64 = base64.b64encode(PASS.encode("utf-8")).decode("ascii")
+
+# One pooled session for all calls: keeps TCP/TLS connections to the CommServe alive
+# across requests and worker threads instead of a fresh handshake per call.
+# Each adapter keeps its own pool; pool_block caps it at MAX_WORKERS and extra callers
+# wait for a free connection. CreateTask uses a separate adapter (below), so up to
+# 2 x MAX_WORKERS connections can be open and a POST does not reuse the GET's socket.
+# Transient 429/5xx responses are retried with backoff (honouring Retry-After).
+SESSION = requests.Session()
+_RETRY = Retry(
+    total=MAX_RETRIES,
+    backoff_factor=RETRY_BACKOFF,
+    status_forcelist=(429, 502, 503, 504),
+    allowed_methods=frozenset(["GET", "POST"]),
+    raise_on_status=False  # let raise_for_status() report the final response
+)
+# CreateTask is not idempotent: a resend after the CommServe accepted the task starts a
+# duplicate restore. Only retry when the request provably was not processed (connect
+# failures, 429/503 rejections); never after a read error or a 502/504.
+_CREATE_TASK_RETRY = Retry(
+    total=MAX_RETRIES,
+    connect=MAX_RETRIES,
+    read=0,
+    other=0,
+    status_forcelist=(429, 503),
+    backoff_factor=RETRY_BACKOFF,
+    allowed_methods=frozenset(["POST"]),
+    raise_on_status=False
+)
+_ADAPTER = HTTPAdapter(
+    pool_connections=1, pool_maxsize=MAX_WORKERS, pool_block=True, max_retries=_RETRY
+)
+_CREATE_TASK_ADAPTER = HTTPAdapter(
+    pool_connections=1, pool_maxsize=MAX_WORKERS, pool_block=True, max_retries=_CREATE_TASK_RETRY
+)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
+# Longest prefix wins, so CreateTask calls use the conservative retry policy
+SESSION.mount(f"{BASE}/CreateTask", _CREATE_TASK_ADAPTER)
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize a request body to compact UTF-8 JSON bytes; uses orjson when installed."""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _loads(r: requests.Response) -> Any:
+    """Decode a JSON response body; uses orjson when installed."""
+    return orjson.loads(r.content) if orjson else r.json()
+
+
 def login() -> str:
     """Returns Authtoken for subsequent calls."""
     payload = {
         "username": USER,
-        "password": base64.b64encode(PASS.encode("utf-8")).decode("ascii"),
+        "password": _PASS_B64,
         "timeout": 30
     }
-    r = requests.post(
+    r = SESSION.post(
         f"{BASE}/Login",
         headers={"Accept": "application/json", "Content-Type": "application/json"},
-        data=json.dumps(payload),
+        data=_dumps(payload),
         verify=VERIFY_TLS
     )
     r.raise_for_status()
-    token = r.json().get("token")
+    token = _loads(r).get("token")
     if not token:
         raise RuntimeError("Login succeeded but no token in response.")
     return token
@@ -78,13 +155,13 @@ def login() -> str:
 
 def get_schedule_properties(token: str, task_id: int) -> Dict[str, Any]:
     """GET /Schedules/{taskId} returns schedule properties (associations, subTasks...)."""
-    r = requests.get(
+    r = SESSION.get(
         f"{BASE}/Schedules/{task_id}",
         headers={"Accept": "application/json", "Authtoken": token},
         verify=VERIFY_TLS
     )
     r.raise_for_status()
-    return r.json()
+    return _loads(r)
 
 
 def build_restore_payload(props: Dict[str, Any]) -> Dict[str, Any]:
@@ -104,23 +181,23 @@ def build_restore_payload(props: Dict[str, Any]) -> Dict[str, Any]:
         raise RuntimeError("Schedule has no associations; cannot build restore request.")
 
     # Find first RESTORE subtask/options
-    restore_opts: Dict[str, Any] = {}
-    for st in sub_tasks:
-        subtask = st.get("subTask", {})
-        if (subtask.get("operationType") == "RESTORE" or
-            subtask.get("subTaskType") == "RESTORE"):
-            restore_opts = st.get("options", {}).get("restoreOptions", {})
-            break
-
-    # Apply overrides on top of schedule's restoreOptions
-    merged_restore_opts = dict(restore_opts)
+    restore_opts: Dict[str, Any] = next(
+        (st.get("options", {}).get("restoreOptions", {})
+         for st in sub_tasks if is_restore_subtask(st)),
+        {}
+    )
+
+    # Collect overrides to apply on top of schedule's restoreOptions
+    changes: Dict[str, Any] = {}
     # Apply destination override if schedule lacks it
     if OVERRIDES.get("destination"):
-        merged_restore_opts["destination"] = OVERRIDES["destination"]
+        changes["destination"] = OVERRIDES["destination"]
     # Apply common flags (examples)
     for k in ("overwriteFiles", "restoreACLsType"):
         if OVERRIDES.get(k) is not None:
-            merged_restore_opts[k] = OVERRIDES[k]
+            changes[k] = OVERRIDES[k]
+    # Only copy the schedule's restoreOptions when something actually changes
+    merged_restore_opts = {**restore_opts, **changes} if changes else restore_opts
 
     # Sanity checks
     dest = merged_restore_opts.get("destination", {})
@@ -150,22 +227,37 @@ def build_restore_payload(props: Dict[str, Any]) -> Dict[str, Any]:
     return payload
 
 
+def is_restore_subtask(st: Dict[str, Any]) -> bool:
+    """True if the subTask's operationType or subTaskType marks it as a restore."""
+    subtask = st.get("subTask", {})
+    return (subtask.get("operationType") in RESTORE_MARKERS or
+            subtask.get("subTaskType") in RESTORE_MARKERS)
+
+
 def normalize_associations(associations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Reduce association objects to the minimal fields required by CreateTask (Restore).
     Common fields: clientName/appName/instanceId/backupsetId/subclientId...
     """
-    out = []
-    for a in associations:
-        out.append({
-            "clientName": a.get("clientName"),
-            "appName": a.get("appName"),
-            "instanceId": a.get("instanceId"),
-            "backupsetId": a.get("backupsetId"),
-            "subclientId": a.get("subclientId"),
-            # Add more if your workload expects them
-        })
-    return out
+    return [_norm_assoc(tuple(map(a.get, ASSOCIATION_KEYS))) for a in associations]
+
+
+def _norm_assoc(values: tuple) -> Dict[str, Any]:
+    """Association dict for one tuple of ASSOCIATION_KEYS values, cached when hashable."""
+    try:
+        return _norm_one(*values)
+    except TypeError:
+        # A field holds a list/dict (unhashable); build it uncached
+        return dict(zip(ASSOCIATION_KEYS, values))
+
+
+@functools.lru_cache(maxsize=128, typed=True)
+def _norm_one(*values: Any) -> Dict[str, Any]:
+    """
+    Cached association dict, so schedules that target the same subclients share it.
+    typed=True keeps e.g. 1 and True apart. The dict is shared: only serialize it, never mutate.
+    """
+    return dict(zip(ASSOCIATION_KEYS, values))
 
 
 def is_in_place_restore(restore_opts: Dict[str, Any]) -> bool:
@@ -179,23 +271,23 @@ def is_in_place_restore(restore_opts: Dict[str, Any]) -> bool:
 
 def submit_restore(token: str, payload: Dict[str, Any]) -> Dict[str, Any]:
     """POST /CreateTask to start the restore; returns response with jobIds."""
-    r = requests.post(
+    r = SESSION.post(
         f"{BASE}/CreateTask",
         headers={
             "Accept": "application/json",
             "Content-Type": "application/json",
             "Authtoken": token
         },
-        data=json.dumps(payload),
+        data=_dumps(payload),
         verify=VERIFY_TLS
     )
     r.raise_for_status()
-    return r.json()
+    return _loads(r)
 
 
 def logout(token: str) -> None:
     try:
-        requests.post(
+        SESSION.post(
             f"{BASE}/Logout",
             headers={"Accept": "application/json", "Authtoken": token},
             verify=VERIFY_TLS
@@ -204,6 +296,17 @@ def logout(token: str) -> None:
         pass
 
 
+def process_one(token: str, task_id: int) -> Dict[str, Any]:
+    """Read one schedule and submit its restore; returns the CreateTask response."""
+    print(f"[INFO] Reading schedule properties for taskId={task_id} ...")
+    props = get_schedule_properties(token, task_id)
+
+    payload = build_restore_payload(props)
+
+    print(f"[INFO] Submitting restore for taskId={task_id} ...")
+    return submit_restore(token, payload)
+
+
 def main():
     if not RESTORE_SCHEDULE_TASK_IDS:
         print("[ERROR] No schedule taskIds configured. Edit RESTORE_SCHEDULE_TASK_IDS.")
@@ -212,21 +315,34 @@ def main():
     print("[INFO] Logging in...")
     token = login()
 
+    failed = 0
     try:
-        for task_id in RESTORE_SCHEDULE_TASK_IDS:
-            print(f"[INFO] Reading schedule properties for taskId={task_id} ...")
-            props = get_schedule_properties(token, task_id)
-
-            payload = build_restore_payload(props)
-
-            print(f"[INFO] Submitting restore for taskId={task_id} ...")
-            resp = submit_restore(token, payload)
-            job_ids = resp.get("jobIds") or resp.get("jobIds", [])
-            print(f"[OK] taskId={task_id} restore submitted. Job IDs: {job_ids}")
+        # Schedules are independent and the work is network-bound, so run them concurrently
+        workers = min(MAX_WORKERS, len(RESTORE_SCHEDULE_TASK_IDS))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            futures = {
+                ex.submit(process_one, token, task_id): task_id
+                for task_id in RESTORE_SCHEDULE_TASK_IDS
+            }
+            for fut in as_completed(futures):
+                task_id = futures[fut]
+                try:
+                    resp = fut.result()
+                except Exception as e:
+                    print(f"[ERROR] Restore failed for taskId={task_id}: {e}")
+                    failed += 1
+                    continue
+                job_ids = resp.get("jobIds") or resp.get("jobIds", [])
+                print(f"[OK] taskId={task_id} restore submitted. Job IDs: {job_ids}")
 
     finally:
         logout(token)
         print("[INFO] Logged out.")
 
+    # Other schedules still ran, but report any failure to the caller (cron, CI, ...)
+    if failed:
+        print(f"[ERROR] {failed} of {len(RESTORE_SCHEDULE_TASK_IDS)} restores failed.")
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()